@@ -0,0 +1,46 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.mail.utils import DNS_NAME
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+@pytest.fixture(scope='session', autouse=True)
+def no_fqdn_lookup():
+    """Skip the socket.getfqdn() call Django makes for Message-IDs"""
+    DNS_NAME._fqdn = 'localhost'
+
+
+@pytest.fixture(scope='session', autouse=True)
+def warm_jwt_backend():
+    """Sign one token up front so no test pays the token backend setup"""
+    # AccessToken is not tracked by the blacklist app, so no database access
+    str(AccessToken.for_user(get_user_model()()))
+
+
+@pytest.fixture
+def user(db):
+    """Verified user for pytest-style tests"""
+    return get_user_model().objects.create_user(
+        email='test@sombreando.com',
+        username='testuser',
+        password='TestPassword123!@#',
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def api_client():
+    """Unauthenticated DRF client with an empty cache"""
+    # Cached users and rate-limit counters outlive the per-test rollback
+    cache.clear()
+    return APIClient()
+
+
+@pytest.fixture
+def auth_client(api_client, user):
+    """DRF client authenticated as the user fixture"""
+    access_token = RefreshToken.for_user(user).access_token
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    return api_client
@@ -7,5 +7,10 @@ class AuthenticationConfig(AppConfig):
     verbose_name = 'Authentication'
 
     def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+
         import sombreando.apps.authentication.signals
 
+        # signals.update_last_login also writes last_login_ip in the same UPDATE
+        user_logged_in.disconnect(dispatch_uid='update_last_login')
+
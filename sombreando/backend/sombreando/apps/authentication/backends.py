@@ -0,0 +1,27 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .utils import get_cached_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that resolves the user through the Redis user cache"""
+    
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token não contém identificação de usuário.")
+        
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("Usuário não encontrado.", code='user_not_found')
+        
+        if not user.is_active:
+            raise AuthenticationFailed("Usuário inativo.", code='user_inactive')
+        
+        return user
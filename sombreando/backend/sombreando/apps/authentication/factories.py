@@ -0,0 +1,17 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from .models import User
+
+
+class UserFactory(DjangoModelFactory):
+    """In-memory users for tests that never touch the database"""
+    
+    class Meta:
+        model = User
+        strategy = factory.BUILD_STRATEGY
+    
+    email = factory.Sequence(lambda n: f'user{n}@sombreando.com')
+    username = factory.Sequence(lambda n: f'user{n}')
+    first_name = 'Test'
+    last_name = 'User'
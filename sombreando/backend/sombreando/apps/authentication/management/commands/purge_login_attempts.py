@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from sombreando.apps.authentication.utils import purge_login_attempts
+
+
+class Command(BaseCommand):
+    help = 'Remove tentativas de login antigas'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Remove tentativas com mais de N dias (padrão: 90)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de linhas removidas por DELETE (padrão: 1000)'
+        )
+    
+    def handle(self, *args, **options):
+        deleted = purge_login_attempts(
+            retention_days=options['days'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} tentativas de login removidas.'
+        ))
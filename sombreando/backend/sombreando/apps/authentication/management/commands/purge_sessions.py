@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from sombreando.apps.authentication.utils import purge_user_sessions
+
+
+class Command(BaseCommand):
+    help = 'Remove sessões inativas'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Remove sessões sem atividade há mais de N dias (padrão: 30)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de linhas removidas por DELETE (padrão: 1000)'
+        )
+    
+    def handle(self, *args, **options):
+        deleted = purge_user_sessions(
+            retention_days=options['days'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} sessões removidas.'
+        ))
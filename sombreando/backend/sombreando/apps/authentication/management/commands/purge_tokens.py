@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from sombreando.apps.authentication.utils import purge_verification_tokens
+
+
+class Command(BaseCommand):
+    help = 'Invalida tokens de verificação expirados e remove os antigos'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Remove tokens expirados há mais de N dias (padrão: 30)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de linhas removidas por DELETE (padrão: 1000)'
+        )
+    
+    def handle(self, *args, **options):
+        expired, deleted = purge_verification_tokens(
+            retention_days=options['days'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{expired} tokens expirados invalidados, {deleted} tokens removidos.'
+        ))
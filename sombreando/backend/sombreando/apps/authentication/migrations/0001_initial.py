@@ -0,0 +1,364 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:03
+
+from django.conf import settings
+import django.contrib.auth.models
+import django.contrib.auth.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="User",
+            fields=[
+                ("password", models.CharField(max_length=128, verbose_name="password")),
+                (
+                    "last_login",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="last login"
+                    ),
+                ),
+                (
+                    "is_superuser",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Designates that this user has all permissions without explicitly assigning them.",
+                        verbose_name="superuser status",
+                    ),
+                ),
+                (
+                    "username",
+                    models.CharField(
+                        error_messages={
+                            "unique": "A user with that username already exists."
+                        },
+                        help_text="Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.",
+                        max_length=150,
+                        unique=True,
+                        validators=[
+                            django.contrib.auth.validators.UnicodeUsernameValidator()
+                        ],
+                        verbose_name="username",
+                    ),
+                ),
+                (
+                    "first_name",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="first name"
+                    ),
+                ),
+                (
+                    "last_name",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="last name"
+                    ),
+                ),
+                (
+                    "is_staff",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Designates whether the user can log into this admin site.",
+                        verbose_name="staff status",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Designates whether this user should be treated as active. Unselect this instead of deleting accounts.",
+                        verbose_name="active",
+                    ),
+                ),
+                (
+                    "date_joined",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="date joined"
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("email", models.EmailField(max_length=254, unique=True)),
+                ("phone", models.CharField(blank=True, max_length=20, null=True)),
+                (
+                    "avatar",
+                    models.ImageField(blank=True, null=True, upload_to="avatars/"),
+                ),
+                ("is_verified", models.BooleanField(default=False)),
+                ("is_2fa_enabled", models.BooleanField(default=False)),
+                (
+                    "company_name",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "subscription_plan",
+                    models.CharField(
+                        choices=[
+                            ("free", "Gratuito"),
+                            ("basic", "Básico"),
+                            ("premium", "Premium"),
+                            ("enterprise", "Empresarial"),
+                        ],
+                        default="free",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "subscription_expires_at",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("last_login_ip", models.GenericIPAddressField(blank=True, null=True)),
+                (
+                    "groups",
+                    models.ManyToManyField(
+                        blank=True,
+                        help_text="The groups this user belongs to. A user will get all permissions granted to each of their groups.",
+                        related_name="user_set",
+                        related_query_name="user",
+                        to="auth.group",
+                        verbose_name="groups",
+                    ),
+                ),
+                (
+                    "user_permissions",
+                    models.ManyToManyField(
+                        blank=True,
+                        help_text="Specific permissions for this user.",
+                        related_name="user_set",
+                        related_query_name="user",
+                        to="auth.permission",
+                        verbose_name="user permissions",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Usuário",
+                "verbose_name_plural": "Usuários",
+                "db_table": "auth_user",
+            },
+            managers=[
+                ("objects", django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UserProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bio", models.TextField(blank=True, max_length=500)),
+                ("location", models.CharField(blank=True, max_length=100)),
+                ("website", models.URLField(blank=True)),
+                ("birth_date", models.DateField(blank=True, null=True)),
+                (
+                    "language",
+                    models.CharField(
+                        choices=[
+                            ("pt-br", "Português (Brasil)"),
+                            ("en", "English"),
+                            ("es", "Español"),
+                        ],
+                        default="pt-br",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "timezone",
+                    models.CharField(default="America/Sao_Paulo", max_length=50),
+                ),
+                ("email_notifications", models.BooleanField(default=True)),
+                ("push_notifications", models.BooleanField(default=True)),
+                ("marketing_emails", models.BooleanField(default=False)),
+                (
+                    "profile_visibility",
+                    models.CharField(
+                        choices=[
+                            ("public", "Público"),
+                            ("private", "Privado"),
+                            ("friends", "Apenas Amigos"),
+                        ],
+                        default="public",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="profile",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Perfil do Usuário",
+                "verbose_name_plural": "Perfis dos Usuários",
+                "db_table": "user_profile",
+            },
+        ),
+        migrations.CreateModel(
+            name="LoginAttempt",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("email", models.EmailField(max_length=254)),
+                ("ip_address", models.GenericIPAddressField()),
+                ("user_agent", models.TextField(blank=True)),
+                ("success", models.BooleanField()),
+                ("failure_reason", models.CharField(blank=True, max_length=100)),
+                ("timestamp", models.DateTimeField(auto_now_add=True)),
+                ("country", models.CharField(blank=True, max_length=100)),
+                ("city", models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                "verbose_name": "Tentativa de Login",
+                "verbose_name_plural": "Tentativas de Login",
+                "db_table": "login_attempt",
+                "indexes": [
+                    models.Index(
+                        fields=["email", "timestamp"],
+                        name="login_attem_email_ad1639_idx",
+                    ),
+                    models.Index(
+                        fields=["ip_address", "timestamp"],
+                        name="login_attem_ip_addr_c30e68_idx",
+                    ),
+                    models.Index(
+                        fields=["success", "timestamp"],
+                        name="login_attem_success_5a066b_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="UserSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("session_key", models.CharField(max_length=40, unique=True)),
+                ("ip_address", models.GenericIPAddressField()),
+                ("user_agent", models.TextField()),
+                ("device_info", models.JSONField(blank=True, default=dict)),
+                ("country", models.CharField(blank=True, max_length=100)),
+                ("city", models.CharField(blank=True, max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("last_activity", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sessão do Usuário",
+                "verbose_name_plural": "Sessões dos Usuários",
+                "db_table": "user_session",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "is_active"],
+                        name="user_sessio_user_id_4f7411_idx",
+                    ),
+                    models.Index(
+                        fields=["session_key"], name="user_sessio_session_ab559f_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="EmailVerificationToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=6)),
+                (
+                    "purpose",
+                    models.CharField(
+                        choices=[
+                            ("email_verification", "Verificação de Email"),
+                            ("password_reset", "Reset de Senha"),
+                            ("login_2fa", "2FA Login"),
+                            ("account_change", "Mudança de Conta"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("expires_at", models.DateTimeField()),
+                ("is_used", models.BooleanField(default=False)),
+                ("attempts", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("used_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="verification_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Token de Verificação",
+                "verbose_name_plural": "Tokens de Verificação",
+                "db_table": "email_verification_token",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "purpose", "is_used"],
+                        name="email_verif_user_id_d06984_idx",
+                    ),
+                    models.Index(
+                        fields=["token", "purpose"], name="email_verif_token_d5c841_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
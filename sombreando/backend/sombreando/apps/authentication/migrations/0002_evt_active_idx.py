@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="emailverificationtoken",
+            name="email_verif_user_id_d06984_idx",
+        ),
+        migrations.AddIndex(
+            model_name="emailverificationtoken",
+            index=models.Index(
+                condition=models.Q(("is_used", False)),
+                fields=["user", "purpose"],
+                name="evt_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:03
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0002_evt_active_idx"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="auth_user_email_lower_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("username"),
+                name="auth_user_username_lower_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0003_user_case_insensitive_uniq"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="usersession",
+            name="last_activity",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
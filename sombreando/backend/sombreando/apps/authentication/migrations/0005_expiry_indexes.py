@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0004_usersession_last_activity_default"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emailverificationtoken",
+            index=models.Index(
+                fields=["expires_at"], name="email_verif_expires_3870db_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usersession",
+            index=models.Index(
+                fields=["last_activity"], name="user_sessio_last_ac_e10a79_idx"
+            ),
+        ),
+    ]
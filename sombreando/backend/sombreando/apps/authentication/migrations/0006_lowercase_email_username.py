@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:07
+
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_email_username(apps, schema_editor):
+    # The case-insensitive unique constraints from 0003 guarantee that
+    # lowercasing cannot produce duplicates.
+    User = apps.get_model("authentication", "User")
+    User.objects.update(email=Lower("email"), username=Lower("username"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0005_expiry_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_email_username, migrations.RunPython.noop),
+    ]
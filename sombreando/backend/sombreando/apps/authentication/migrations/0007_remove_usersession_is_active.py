@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:07
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0006_lowercase_email_username"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="usersession",
+            name="user_sessio_user_id_4f7411_idx",
+        ),
+        migrations.RemoveField(
+            model_name="usersession",
+            name="is_active",
+        ),
+    ]
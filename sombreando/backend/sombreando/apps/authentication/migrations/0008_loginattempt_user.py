@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-15 20:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Lower
+import django.db.models.deletion
+
+
+def backfill_login_attempt_user(apps, schema_editor):
+    # User emails are stored lowercase since 0006; attempts may not be.
+    User = apps.get_model("authentication", "User")
+    LoginAttempt = apps.get_model("authentication", "LoginAttempt")
+    LoginAttempt.objects.update(
+        user=Subquery(
+            User.objects.filter(email=Lower(OuterRef("email"))).values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0007_remove_usersession_is_active"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="loginattempt",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="login_attempts",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(
+                fields=["user", "timestamp"], name="login_attem_user_id_44c254_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_login_attempt_user, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from datetime import timedelta
 import uuid
@@ -16,6 +17,8 @@ class User(AbstractUser):
     ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Plain unique index: required for USERNAME_FIELD (auth.E003) and serves
+    # the equality lookups; the Lower() constraint below only guards writes
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
@@ -47,10 +50,33 @@ class User(AbstractUser):
         db_table = 'auth_user'
         verbose_name = 'Usuário'
         verbose_name_plural = 'Usuários'
+        constraints = [
+            # save() lowercases; these also cover bulk_create, update() and raw SQL
+            models.UniqueConstraint(Lower('email'), name='auth_user_email_lower_uniq'),
+            models.UniqueConstraint(Lower('username'), name='auth_user_username_lower_uniq'),
+        ]
     
     def __str__(self):
         return self.email
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Values as loaded, so cache receivers can evict keys for a renamed email/username
+        instance._loaded_identity = (
+            instance.__dict__.get('email'),
+            instance.__dict__.get('username'),
+        )
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Stored lowercase so lookups are plain equality on the unique indexes
+        if self.email:
+            self.email = self.email.lower()
+        if self.username:
+            self.username = self.username.lower()
+        super().save(*args, **kwargs)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -135,8 +161,14 @@ class EmailVerificationToken(models.Model):
         verbose_name = 'Token de Verificação'
         verbose_name_plural = 'Tokens de Verificação'
         indexes = [
-            models.Index(fields=['user', 'purpose', 'is_used']),
+            # Only unused tokens are ever looked up, so keep used ones out of the index
+            models.Index(
+                fields=['user', 'purpose'],
+                condition=models.Q(is_used=False),
+                name='evt_active_idx'
+            ),
             models.Index(fields=['token', 'purpose']),
+            models.Index(fields=['expires_at']),
         ]
     
     def __str__(self):
@@ -153,12 +185,21 @@ class EmailVerificationToken(models.Model):
     def mark_as_used(self):
         self.is_used = True
         self.used_at = timezone.now()
-        self.save()
+        self.save(update_fields=['is_used', 'used_at'])
 
 
 class LoginAttempt(models.Model):
     """Track login attempts for security monitoring"""
     
+    # Null when the email doesn't belong to any account
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,  # covered by the (user, timestamp) index
+        related_name='login_attempts'
+    )
     email = models.EmailField()
     ip_address = models.GenericIPAddressField()
     user_agent = models.TextField(blank=True)
@@ -175,6 +216,7 @@ class LoginAttempt(models.Model):
         verbose_name = 'Tentativa de Login'
         verbose_name_plural = 'Tentativas de Login'
         indexes = [
+            models.Index(fields=['user', 'timestamp']),
             models.Index(fields=['email', 'timestamp']),
             models.Index(fields=['ip_address', 'timestamp']),
             models.Index(fields=['success', 'timestamp']),
@@ -186,7 +228,7 @@ class LoginAttempt(models.Model):
 
 
 class UserSession(models.Model):
-    """Track active user sessions"""
+    """Track active user sessions; stale rows are deleted, not flagged"""
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sessions')
     session_key = models.CharField(max_length=40, unique=True)
@@ -199,16 +241,15 @@ class UserSession(models.Model):
     city = models.CharField(max_length=100, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
-    last_activity = models.DateTimeField(auto_now=True)
-    is_active = models.BooleanField(default=True)
+    last_activity = models.DateTimeField(default=timezone.now)
     
     class Meta:
         db_table = 'user_session'
         verbose_name = 'Sessão do Usuário'
         verbose_name_plural = 'Sessões dos Usuários'
         indexes = [
-            models.Index(fields=['user', 'is_active']),
             models.Index(fields=['session_key']),
+            models.Index(fields=['last_activity']),
         ]
     
     def __str__(self):
@@ -1,9 +1,12 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from .models import User, UserProfile, EmailVerificationToken
-from .utils import send_verification_email, generate_verification_token
+from django.db import transaction
+from .models import User, UserProfile
+from .tasks import send_verification_email_task
+from .utils import get_verification_token, get_cached_user_by_email
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -33,14 +36,16 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         }
     
     def validate_email(self, value):
-        if User.objects.filter(email__iexact=value).exists():
+        value = value.lower()
+        if User.objects.filter(email=value).exists():
             raise serializers.ValidationError("Este email já está em uso.")
-        return value.lower()
+        return value
     
     def validate_username(self, value):
-        if User.objects.filter(username__iexact=value).exists():
+        value = value.lower()
+        if User.objects.filter(username=value).exists():
             raise serializers.ValidationError("Este nome de usuário já está em uso.")
-        return value.lower()
+        return value
     
     def validate(self, attrs):
         if attrs['password'] != attrs['password_confirm']:
@@ -51,16 +56,17 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
         
-        user = User.objects.create_user(
-            password=password,
-            **validated_data
-        )
-        
-        # Create user profile
-        UserProfile.objects.create(user=user)
-        
-        # Send verification email
-        send_verification_email(user, 'email_verification')
+        # The profile is created by a post_save signal in the same transaction
+        with transaction.atomic():
+            user = User.objects.create_user(
+                password=password,
+                **validated_data
+            )
+            
+            # Send verification email once the user is committed
+            transaction.on_commit(
+                lambda: send_verification_email_task.delay(str(user.id), 'email_verification')
+            )
         
         return user
 
@@ -72,17 +78,16 @@ class UserLoginSerializer(serializers.Serializer):
     password = serializers.CharField(style={'input_type': 'password'})
     verification_code = serializers.CharField(max_length=6, required=False)
     
+    def validate_email(self, value):
+        return value.lower()
+    
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
         verification_code = attrs.get('verification_code')
         
         if email and password:
-            user = authenticate(
-                request=self.context.get('request'),
-                username=email,
-                password=password
-            )
+            user = self._authenticate(email, password)
             
             if not user:
                 raise serializers.ValidationError("Credenciais inválidas.")
@@ -97,19 +102,16 @@ class UserLoginSerializer(serializers.Serializer):
             if user.is_2fa_enabled:
                 if not verification_code:
                     # Send 2FA code
-                    send_verification_email(user, 'login_2fa')
+                    transaction.on_commit(
+                        lambda: send_verification_email_task.delay(str(user.id), 'login_2fa')
+                    )
                     raise serializers.ValidationError({
                         'requires_2fa': True,
                         'message': 'Código de verificação enviado para seu email.'
                     })
                 else:
                     # Validate 2FA code
-                    token = EmailVerificationToken.objects.filter(
-                        user=user,
-                        token=verification_code,
-                        purpose='login_2fa',
-                        is_used=False
-                    ).first()
+                    token = get_verification_token(user, 'login_2fa', verification_code)
                     
                     if not token or not token.is_valid:
                         raise serializers.ValidationError("Código de verificação inválido ou expirado.")
@@ -120,6 +122,38 @@ class UserLoginSerializer(serializers.Serializer):
             return attrs
         else:
             raise serializers.ValidationError("Email e senha são obrigatórios.")
+    
+    def _authenticate(self, email, password):
+        """Check credentials against the cached user instead of the backend chain"""
+        if list(settings.AUTHENTICATION_BACKENDS) != ['django.contrib.auth.backends.ModelBackend']:
+            return authenticate(
+                request=self.context.get('request'),
+                username=email,
+                password=password
+            )
+        
+        user = get_cached_user_by_email(email)
+        if user is None:
+            # Hash anyway so response time doesn't reveal unknown emails
+            User().set_password(password)
+            return None
+        
+        if not user.check_password(password) or not user.is_active:
+            return None
+        
+        return user
+
+
+class UserProfileDetailSerializer(serializers.ModelSerializer):
+    """Detailed serializer for user profile"""
+    
+    class Meta:
+        model = UserProfile
+        fields = [
+            'bio', 'location', 'website', 'birth_date', 'language', 'timezone',
+            'email_notifications', 'push_notifications', 'marketing_emails',
+            'profile_visibility'
+        ]
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -127,7 +161,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     
     full_name = serializers.ReadOnlyField()
     is_subscription_active = serializers.ReadOnlyField()
-    profile = serializers.SerializerMethodField()
+    profile = UserProfileDetailSerializer(read_only=True, allow_null=True)
     
     class Meta:
         model = User
@@ -137,23 +171,6 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'subscription_plan', 'is_subscription_active', 'created_at', 'profile'
         ]
         read_only_fields = ['id', 'email', 'is_verified', 'created_at']
-    
-    def get_profile(self, obj):
-        if hasattr(obj, 'profile'):
-            return UserProfileDetailSerializer(obj.profile).data
-        return None
-
-
-class UserProfileDetailSerializer(serializers.ModelSerializer):
-    """Detailed serializer for user profile"""
-    
-    class Meta:
-        model = UserProfile
-        fields = [
-            'bio', 'location', 'website', 'birth_date', 'language', 'timezone',
-            'email_notifications', 'push_notifications', 'marketing_emails',
-            'profile_visibility'
-        ]
 
 
 class PasswordChangeSerializer(serializers.Serializer):
@@ -180,7 +197,7 @@ class PasswordChangeSerializer(serializers.Serializer):
     def save(self):
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         return user
 
 
@@ -192,12 +209,7 @@ class EmailVerificationSerializer(serializers.Serializer):
     def validate_token(self, value):
         user = self.context['request'].user
         
-        token = EmailVerificationToken.objects.filter(
-            user=user,
-            token=value,
-            purpose='email_verification',
-            is_used=False
-        ).first()
+        token = get_verification_token(user, 'email_verification', value)
         
         if not token:
             raise serializers.ValidationError("Token inválido.")
@@ -205,20 +217,16 @@ class EmailVerificationSerializer(serializers.Serializer):
         if not token.is_valid:
             raise serializers.ValidationError("Token expirado ou inválido.")
         
+        # Reused by save() instead of querying the token again
+        self._token = token
         return value
     
     def save(self):
         user = self.context['request'].user
-        token = EmailVerificationToken.objects.get(
-            user=user,
-            token=self.validated_data['token'],
-            purpose='email_verification',
-            is_used=False
-        )
         
-        token.mark_as_used()
+        self._token.mark_as_used()
         user.is_verified = True
-        user.save()
+        user.save(update_fields=['is_verified'])
         
         return user
 
@@ -238,19 +246,16 @@ class Toggle2FASerializer(serializers.Serializer):
             # Enabling 2FA requires verification
             if not verification_code:
                 # Send verification code
-                send_verification_email(user, 'account_change')
+                transaction.on_commit(
+                    lambda: send_verification_email_task.delay(str(user.id), 'account_change')
+                )
                 raise serializers.ValidationError({
                     'requires_verification': True,
                     'message': 'Código de verificação enviado para seu email.'
                 })
             else:
                 # Validate verification code
-                token = EmailVerificationToken.objects.filter(
-                    user=user,
-                    token=verification_code,
-                    purpose='account_change',
-                    is_used=False
-                ).first()
+                token = get_verification_token(user, 'account_change', verification_code)
                 
                 if not token or not token.is_valid:
                     raise serializers.ValidationError("Código de verificação inválido ou expirado.")
@@ -267,7 +272,7 @@ class Toggle2FASerializer(serializers.Serializer):
             self.validated_data['token'].mark_as_used()
         
         user.is_2fa_enabled = enable
-        user.save()
+        user.save(update_fields=['is_2fa_enabled'])
         
         return user
 
@@ -0,0 +1,101 @@
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import User, UserProfile, UserSession, EmailVerificationToken
+from .utils import (
+    get_blocked_email_domains,
+    render_email_skeleton,
+    user_cache_key,
+    availability_cache_key,
+    verification_cache_key,
+    get_client_ip,
+    get_user_device_info,
+)
+
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    """Every user gets a profile, whichever code path created it"""
+    if created and not raw:
+        UserProfile.objects.create(user=instance)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached user and availability answers whenever the row changes"""
+    # A renamed email/username frees the old value, so evict that answer too
+    old_email, old_username = getattr(instance, '_loaded_identity', (None, None))
+    keys = {
+        user_cache_key(instance.pk),
+        availability_cache_key('email', instance.email),
+        availability_cache_key('username', instance.username),
+    }
+    if old_email:
+        keys.add(availability_cache_key('email', old_email))
+    if old_username:
+        keys.add(availability_cache_key('username', old_username))
+    cache.delete_many(keys)
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_user_profile_cache(sender, instance, **kwargs):
+    """The profile is cached together with its user"""
+    cache.delete(user_cache_key(instance.user_id))
+
+
+@receiver(post_save, sender=EmailVerificationToken)
+def invalidate_used_verification_token(sender, instance, **kwargs):
+    """A used token must not be accepted from cache again"""
+    if instance.is_used:
+        cache.delete(verification_cache_key(instance.user_id, instance.purpose))
+
+
+@receiver(user_logged_in)
+def update_last_login(sender, request, user, **kwargs):
+    """Write last_login and last_login_ip in one UPDATE (replaces Django's receiver)"""
+    user.last_login = timezone.now()
+    update_fields = ['last_login']
+    if request is not None:
+        user.last_login_ip = get_client_ip(request)
+        update_fields.append('last_login_ip')
+    user.save(update_fields=update_fields)
+
+
+@receiver(user_logged_in)
+def record_user_session(sender, request, user, **kwargs):
+    """Record the login device; sessions themselves live in the cache"""
+    if request is None:
+        return
+    
+    if not request.session.session_key:
+        request.session.save()
+    
+    device_info = get_user_device_info(request)
+    UserSession.objects.update_or_create(
+        session_key=request.session.session_key,
+        defaults={
+            'user': user,
+            'ip_address': get_client_ip(request),
+            'user_agent': device_info['user_agent'],
+            'device_info': device_info,
+            'last_activity': timezone.now(),
+        }
+    )
+
+
+@receiver(setting_changed)
+def clear_blocked_email_domains(sender, setting, **kwargs):
+    """Rebuild the blocked domain set when tests override the setting"""
+    if setting == 'BLOCKED_EMAIL_DOMAINS':
+        get_blocked_email_domains.cache_clear()
+
+
+@receiver(setting_changed)
+def clear_email_skeletons(sender, setting, **kwargs):
+    """Re-render email templates when tests override the template settings"""
+    if setting == 'TEMPLATES':
+        render_email_skeleton.cache_clear()
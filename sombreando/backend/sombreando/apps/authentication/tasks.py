@@ -0,0 +1,45 @@
+import smtplib
+
+from celery import shared_task
+
+from .models import User, LoginAttempt, EmailVerificationToken, UserSession
+from .utils import send_verification_email
+
+
+@shared_task(
+    autoretry_for=(smtplib.SMTPException, ConnectionError),
+    retry_backoff=True,
+    max_retries=5
+)
+def send_verification_email_task(user_id, purpose):
+    """Send a verification email outside the request cycle"""
+    user = User.objects.get(pk=user_id)
+    return send_verification_email(user, purpose, fail_silently=False)
+
+
+@shared_task(ignore_result=True)
+def log_login_attempt_task(email, ip_address, user_agent, success, failure_reason=''):
+    """Persist a login attempt for security monitoring"""
+    # Failed attempts on a known email still belong to that account.
+    # The raw request value may be any JSON type.
+    email = str(email or '').lower()
+    LoginAttempt.objects.create(
+        user_id=User.objects.filter(email=email).values_list('pk', flat=True).first(),
+        email=email,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        success=success,
+        failure_reason=failure_reason
+    )
+
+
+@shared_task(ignore_result=True)
+def purge_user_data_task(user_id):
+    """Remove tokens, sessions and the avatar of a deleted account"""
+    EmailVerificationToken.objects.filter(user_id=user_id).delete()
+    UserSession.objects.filter(user_id=user_id).delete()
+    
+    user = User.objects.get(pk=user_id)
+    if user.avatar:
+        user.avatar.delete(save=False)
+        user.save(update_fields=['avatar'])
@@ -1,21 +1,245 @@
 import random
+import re
+import secrets
 import string
 from datetime import timedelta
+from functools import lru_cache
 from django.utils import timezone
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.mail import get_connection, send_mail
+from django.template import TemplateDoesNotExist
 from django.template.loader import render_to_string
+from django.utils.formats import date_format
+from django.utils.html import escape
 from django.conf import settings
-from .models import EmailVerificationToken
+from django.db.models import Count, Q
+from rest_framework.throttling import BaseThrottle
+from .models import User, EmailVerificationToken, LoginAttempt, UserSession
+
+USER_CACHE_TIMEOUT = 300  # 5 minutes
+VERIFICATION_TOKEN_LIFETIME = timedelta(hours=24)
+AVAILABILITY_CACHE_TIMEOUT = 30
+TAKEN_CACHE_TIMEOUT = 300
+LOGIN_STATS_CACHE_TIMEOUT = 60
+PASSWORD_SPECIAL_CHARS = frozenset("!@#$%^&*(),.?\":{}|<>")
+PASSWORD_COMMON_PATTERNS = ('123456', 'password', 'qwerty', 'abc123')
+
+EMAIL_TEMPLATES = {
+    'email_verification': {
+        'subject': 'Verificação de Email - Sombreando',
+        'template': 'emails/email_verification.html',
+    },
+    'password_reset': {
+        'subject': 'Reset de Senha - Sombreando',
+        'template': 'emails/password_reset.html',
+    },
+    'login_2fa': {
+        'subject': 'Código de Verificação - Sombreando',
+        'template': 'emails/login_2fa.html',
+    },
+    'account_change': {
+        'subject': 'Verificação de Mudança de Conta - Sombreando',
+        'template': 'emails/account_change.html',
+    },
+}
+
+EMAIL_PLACEHOLDERS = ('__FIRST_NAME__', '__TOKEN__', '__EXPIRES_AT__')
+EMAIL_TEMPLATE_MISSING = object()
+
+EMAIL_PLAIN_MESSAGE = """
+        Olá {first_name},
+        
+        Seu código de verificação é: {token}
+        
+        Este código expira em 24 horas.
+        
+        Se você não solicitou este código, ignore este email.
+        
+        Atenciosamente,
+        Equipe Sombreando
+        """
+
+
+def user_cache_key(user_id):
+    """Cache key holding the serialized user (with profile) for a user id"""
+    return f"user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """Return the user (with profile joined) from cache, loading it on a miss"""
+    return cache.get_or_set(
+        user_cache_key(user_id),
+        lambda: User.objects.select_related('profile').get(pk=user_id),
+        USER_CACHE_TIMEOUT
+    )
+
+
+def get_cached_user_by_email(email):
+    """Return the user with this exact email through the user cache, or None"""
+    key = f"user:email:{email}"
+    user_id = cache.get(key)
+    
+    if user_id is not None:
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist:
+            user = None
+        # The email may have changed since the id was cached
+        if user is not None and user.email == email:
+            return user
+    
+    user = User.objects.select_related('profile').filter(email=email).first()
+    if user is not None:
+        cache.set(key, user.pk, USER_CACHE_TIMEOUT)
+        cache.set(user_cache_key(user.pk), user, USER_CACHE_TIMEOUT)
+    return user
+
+
+def availability_cache_key(field, value):
+    """Cache key holding whether a (lowercase) email or username is free"""
+    return f"avail:{field}:{value}"
+
+
+def is_available(field, value):
+    """Check that no user has the (lowercase) value for field, caching the answer"""
+    key = availability_cache_key(field, value)
+    available = cache.get(key)
+    if available is None:
+        available = not User.objects.filter(**{field: value}).exists()
+        # Taken values rarely free up; signups drop their keys via signals
+        timeout = AVAILABILITY_CACHE_TIMEOUT if available else TAKEN_CACHE_TIMEOUT
+        cache.set(key, available, timeout)
+    return available
+
+
+def get_login_attempt_stats(user):
+    """Today's and total login attempts for a user, cached briefly for dashboards"""
+    def count_attempts():
+        return LoginAttempt.objects.filter(user_id=user.pk).aggregate(
+            today=Count('id', filter=Q(timestamp__date=timezone.now().date())),
+            total=Count('id'),
+        )
+    
+    return cache.get_or_set(f"login_stats:{user.pk}", count_attempts, LOGIN_STATS_CACHE_TIMEOUT)
+
+
+def verification_cache_key(user_id, purpose):
+    """Cache key holding the latest verification token for a user and purpose"""
+    return f"verif:{user_id}:{purpose}"
+
+
+def get_verification_token(user, purpose, code):
+    """Return the active token matching code, or None
+    
+    The latest token lives in cache, so wrong codes are rejected and counted
+    without touching the database. Falls back to the database on a miss.
+    """
+    key = verification_cache_key(user.pk, purpose)
+    token = cache.get(key)
+    
+    if token is None:
+        return EmailVerificationToken.objects.filter(
+            user=user,
+            token=code,
+            purpose=purpose,
+            is_used=False
+        ).first()
+    
+    attempts_key = f"{key}:attempts"
+    if token.token != code:
+        timeout = max(int((token.expires_at - timezone.now()).total_seconds()), 1)
+        cache.add(attempts_key, 0, timeout)
+        try:
+            cache.incr(attempts_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(attempts_key, 1, timeout)
+        return None
+    
+    token.attempts = cache.get(attempts_key, 0)
+    return token
 
 
 def generate_verification_token(length=6):
     """Generate a random verification token"""
-    return ''.join(random.choices(string.digits, k=length))
+    # CSPRNG; one random integer instead of a list of digit strings
+    return str(secrets.randbelow(10 ** length)).zfill(length)
+
+
+class _SkeletonUser:
+    """Stand-in user for skeleton rendering that notes reads of other attributes"""
+    
+    first_name = '__FIRST_NAME__'
+    
+    def __init__(self):
+        self.other_reads = []
+    
+    def __getattr__(self, name):
+        self.other_reads.append(name)
+        return ''
+
+
+@lru_cache(maxsize=None)
+def render_email_skeleton(template_name):
+    """
+    Render an email template once with placeholders for the per-user values.
+    
+    Templates may use {{ user.first_name }}, {{ token }}, {{ expires_at }},
+    {{ site_name }} and {{ site_url }}, unfiltered. The first three come out
+    as __FIRST_NAME__, __TOKEN__ and __EXPIRES_AT__ for the caller to
+    substitute. Returns EMAIL_TEMPLATE_MISSING when the template doesn't exist
+    and None when it reads another user attribute or a placeholder doesn't
+    survive rendering (e.g. {{ expires_at|date:"d/m" }}); such templates must
+    be rendered per user.
+    """
+    user = _SkeletonUser()
+    context = {
+        'user': user,
+        'token': '__TOKEN__',
+        'expires_at': '__EXPIRES_AT__',
+        'site_name': 'Sombreando',
+        'site_url': getattr(settings, 'SITE_URL', 'https://sombreando.com'),
+    }
+    try:
+        skeleton = render_to_string(template_name, context)
+    except TemplateDoesNotExist:
+        return EMAIL_TEMPLATE_MISSING
+    
+    if user.other_reads or not all(p in skeleton for p in EMAIL_PLACEHOLDERS):
+        return None
+    return skeleton
+
 
+def render_verification_html(template_name, user, token_code, expires_at):
+    """HTML body for a verification email, or None when the template doesn't exist"""
+    skeleton = render_email_skeleton(template_name)
+    if skeleton is EMAIL_TEMPLATE_MISSING:
+        return None
+    
+    if skeleton is None:
+        return render_to_string(template_name, {
+            'user': user,
+            'token': token_code,
+            'expires_at': expires_at,
+            'site_name': 'Sombreando',
+            'site_url': getattr(settings, 'SITE_URL', 'https://sombreando.com'),
+        })
+    
+    return (
+        skeleton
+        .replace('__FIRST_NAME__', escape(user.first_name))
+        .replace('__TOKEN__', token_code)
+        .replace('__EXPIRES_AT__', date_format(timezone.localtime(expires_at), 'DATETIME_FORMAT'))
+    )
 
-def send_verification_email(user, purpose):
+
+def send_verification_email(user, purpose, fail_silently=True, connection=None):
     """Send verification email to user"""
     
+    email_config = EMAIL_TEMPLATES.get(purpose)
+    if not email_config:
+        raise ValueError(f"Unknown email purpose: {purpose}")
+    
     # Delete old unused tokens for this purpose
     EmailVerificationToken.objects.filter(
         user=user,
@@ -25,7 +249,7 @@ def send_verification_email(user, purpose):
     
     # Generate new token
     token_code = generate_verification_token()
-    expires_at = timezone.now() + timedelta(hours=24)
+    expires_at = timezone.now() + VERIFICATION_TOKEN_LIFETIME
     
     # Create token record
     token = EmailVerificationToken.objects.create(
@@ -35,69 +259,14 @@ def send_verification_email(user, purpose):
         expires_at=expires_at
     )
     
-    # Email content based on purpose
-    email_templates = {
-        'email_verification': {
-            'subject': 'Verificação de Email - Sombreando',
-            'template': 'emails/email_verification.html',
-        },
-        'password_reset': {
-            'subject': 'Reset de Senha - Sombreando',
-            'template': 'emails/password_reset.html',
-        },
-        'login_2fa': {
-            'subject': 'Código de Verificação - Sombreando',
-            'template': 'emails/login_2fa.html',
-        },
-        'account_change': {
-            'subject': 'Verificação de Mudança de Conta - Sombreando',
-            'template': 'emails/account_change.html',
-        },
-    }
+    # Keep the token in cache for the verification hot path
+    key = verification_cache_key(user.pk, purpose)
+    cache.set(key, token, int(VERIFICATION_TOKEN_LIFETIME.total_seconds()))
+    cache.delete(f"{key}:attempts")
     
-    email_config = email_templates.get(purpose)
-    if not email_config:
-        raise ValueError(f"Unknown email purpose: {purpose}")
-    
-    # Prepare email context
-    context = {
-        'user': user,
-        'token': token_code,
-        'expires_at': expires_at,
-        'site_name': 'Sombreando',
-        'site_url': getattr(settings, 'SITE_URL', 'https://sombreando.com'),
-    }
-    
-    # Render email content
-    try:
-        html_message = render_to_string(email_config['template'], context)
-        plain_message = f"""
-        Olá {user.first_name},
-        
-        Seu código de verificação é: {token_code}
-        
-        Este código expira em 24 horas.
-        
-        Se você não solicitou este código, ignore este email.
-        
-        Atenciosamente,
-        Equipe Sombreando
-        """
-    except:
-        # Fallback to plain text if template doesn't exist
-        html_message = None
-        plain_message = f"""
-        Olá {user.first_name},
-        
-        Seu código de verificação é: {token_code}
-        
-        Este código expira em 24 horas.
-        
-        Se você não solicitou este código, ignore este email.
-        
-        Atenciosamente,
-        Equipe Sombreando
-        """
+    # Plain text only if the HTML template doesn't exist
+    html_message = render_verification_html(email_config['template'], user, token_code, expires_at)
+    plain_message = EMAIL_PLAIN_MESSAGE.format(first_name=user.first_name, token=token_code)
     
     # Send email
     try:
@@ -108,13 +277,25 @@ def send_verification_email(user, purpose):
             recipient_list=[user.email],
             html_message=html_message,
             fail_silently=False,
+            connection=connection,
         )
         return True
     except Exception as e:
+        if not fail_silently:
+            raise
         print(f"Failed to send email: {e}")
         return False
 
 
+def send_verification_emails_bulk(users, purpose):
+    """Send verification emails to several users over one SMTP connection"""
+    with get_connection() as connection:
+        return sum(
+            send_verification_email(user, purpose, connection=connection)
+            for user in users
+        )
+
+
 def get_client_ip(request):
     """Get client IP address from request"""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -132,131 +313,218 @@ def validate_password_strength(password):
     if len(password) < 12:
         errors.append("A senha deve ter pelo menos 12 caracteres.")
     
-    if not any(c.isupper() for c in password):
+    # Classify every character in a single pass
+    has_upper = has_lower = has_digit = has_special = False
+    for c in password:
+        if c.isupper():
+            has_upper = True
+        elif c.islower():
+            has_lower = True
+        elif c.isdigit():
+            has_digit = True
+        if c in PASSWORD_SPECIAL_CHARS:
+            has_special = True
+    
+    if not has_upper:
         errors.append("A senha deve conter pelo menos uma letra maiúscula.")
     
-    if not any(c.islower() for c in password):
+    if not has_lower:
         errors.append("A senha deve conter pelo menos uma letra minúscula.")
     
-    if not any(c.isdigit() for c in password):
+    if not has_digit:
         errors.append("A senha deve conter pelo menos um número.")
     
-    special_chars = "!@#$%^&*(),.?\":{}|<>"
-    if not any(c in special_chars for c in password):
+    if not has_special:
         errors.append("A senha deve conter pelo menos um caractere especial.")
     
     # Check for common patterns
-    common_patterns = ['123456', 'password', 'qwerty', 'abc123']
-    if any(pattern in password.lower() for pattern in common_patterns):
+    password_lower = password.lower()
+    if any(pattern in password_lower for pattern in PASSWORD_COMMON_PATTERNS):
         errors.append("A senha não pode conter padrões comuns.")
     
     return errors
 
 
+@lru_cache(maxsize=1)
+def get_blocked_email_domains():
+    """BLOCKED_EMAIL_DOMAINS as a lowercase set, built once (cleared on setting_changed)"""
+    return frozenset(d.lower() for d in getattr(settings, 'BLOCKED_EMAIL_DOMAINS', []))
+
+
 def is_email_domain_allowed(email):
     """Check if email domain is allowed"""
-    blocked_domains = getattr(settings, 'BLOCKED_EMAIL_DOMAINS', [])
-    domain = email.split('@')[1].lower()
-    return domain not in blocked_domains
+    return email.rsplit('@', 1)[1].lower() not in get_blocked_email_domains()
 
 
 def generate_username_suggestions(base_username, count=5):
     """Generate username suggestions based on a base username"""
-    from .models import User
-    
+    base_username = base_username.lower()
     suggestions = []
     
-    # Try base username with numbers
-    for i in range(1, count + 1):
-        suggestion = f"{base_username}{i}"
-        if not User.objects.filter(username__iexact=suggestion).exists():
-            suggestions.append(suggestion)
-    
-    # Try base username with random suffixes
-    while len(suggestions) < count:
-        suffix = ''.join(random.choices(string.digits, k=3))
-        suggestion = f"{base_username}_{suffix}"
-        if (not User.objects.filter(username__iexact=suggestion).exists() and 
-            suggestion not in suggestions):
-            suggestions.append(suggestion)
-    
-    return suggestions[:count]
+    # Try base username with numbers, then random suffixes; one query per batch
+    candidates = [f"{base_username}{i}" for i in range(1, count + 1)]
+    while True:
+        taken = set(
+            User.objects.filter(username__in=candidates).values_list('username', flat=True)
+        )
+        for candidate in candidates:
+            if candidate not in taken and candidate not in suggestions:
+                suggestions.append(candidate)
+        
+        if len(suggestions) >= count:
+            return suggestions[:count]
+        
+        candidates = [
+            f"{base_username}_{''.join(random.choices(string.digits, k=3))}"
+            for _ in range(count)
+        ]
 
 
 def cleanup_expired_tokens():
     """Clean up expired verification tokens"""
-    expired_tokens = EmailVerificationToken.objects.filter(
+    count, _ = EmailVerificationToken.objects.filter(
         expires_at__lt=timezone.now()
-    )
-    count = expired_tokens.count()
-    expired_tokens.delete()
+    ).delete()
     return count
 
 
+def delete_in_batches(queryset, batch_size=1000):
+    """Delete the rows matched by queryset in primary-key batches"""
+    total = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+        queryset.model.objects.filter(pk__in=pks).delete()
+        total += len(pks)
+
+
+def purge_verification_tokens(retention_days=30, batch_size=1000):
+    """Invalidate expired tokens and delete the ones past the retention window"""
+    now = timezone.now()
+    
+    expired = EmailVerificationToken.objects.filter(
+        expires_at__lt=now,
+        is_used=False
+    ).update(is_used=True)
+    
+    deleted = delete_in_batches(
+        EmailVerificationToken.objects.filter(
+            expires_at__lt=now - timedelta(days=retention_days)
+        ),
+        batch_size
+    )
+    return expired, deleted
+
+
+def purge_login_attempts(retention_days=90, batch_size=1000):
+    """Delete login attempts older than the retention window"""
+    return delete_in_batches(
+        LoginAttempt.objects.filter(
+            timestamp__lt=timezone.now() - timedelta(days=retention_days)
+        ),
+        batch_size
+    )
+
+
+def purge_user_sessions(retention_days=30, batch_size=1000):
+    """Delete sessions idle for longer than the retention window"""
+    return delete_in_batches(
+        UserSession.objects.filter(
+            last_activity__lt=timezone.now() - timedelta(days=retention_days)
+        ),
+        batch_size
+    )
+
+
+# Lookahead so keywords inside other keywords are still found in a single pass
+_USER_AGENT_RE = re.compile(
+    r'(?=(mobile|android|iphone|tablet|ipad|chrome|firefox|safari|edge|windows|mac|linux|ios))'
+)
+_MOBILE_KEYWORDS = {'mobile', 'android', 'iphone'}
+_TABLET_KEYWORDS = {'tablet', 'ipad'}
+# First match wins, in this order
+_BROWSERS = [
+    ('chrome', 'Chrome'),
+    ('firefox', 'Firefox'),
+    ('safari', 'Safari'),
+    ('edge', 'Edge'),
+]
+_OPERATING_SYSTEMS = [
+    ('windows', 'Windows'),
+    ('mac', 'macOS'),
+    ('linux', 'Linux'),
+    ('android', 'Android'),
+    ('ios', 'iOS'),
+]
+
+
+@lru_cache(maxsize=1024)
+def _parse_user_agent(user_agent):
+    """Return (is_mobile, is_tablet, browser, os) for a user agent string"""
+    found = set(_USER_AGENT_RE.findall(user_agent.lower()))
+    
+    is_mobile = not found.isdisjoint(_MOBILE_KEYWORDS)
+    is_tablet = not is_mobile and not found.isdisjoint(_TABLET_KEYWORDS)
+    browser = next((name for key, name in _BROWSERS if key in found), 'Unknown')
+    os_name = next((name for key, name in _OPERATING_SYSTEMS if key in found), 'Unknown')
+    
+    return is_mobile, is_tablet, browser, os_name
+
+
 def get_user_device_info(request):
     """Extract device information from request"""
     user_agent = request.META.get('HTTP_USER_AGENT', '')
+    is_mobile, is_tablet, browser, os_name = _parse_user_agent(user_agent)
     
-    device_info = {
+    return {
         'user_agent': user_agent,
-        'is_mobile': False,
-        'is_tablet': False,
-        'is_desktop': True,
-        'browser': 'Unknown',
-        'os': 'Unknown',
+        'is_mobile': is_mobile,
+        'is_tablet': is_tablet,
+        'is_desktop': not (is_mobile or is_tablet),
+        'browser': browser,
+        'os': os_name,
     }
-    
-    # Simple device detection
-    user_agent_lower = user_agent.lower()
-    
-    if any(mobile in user_agent_lower for mobile in ['mobile', 'android', 'iphone']):
-        device_info['is_mobile'] = True
-        device_info['is_desktop'] = False
-    elif any(tablet in user_agent_lower for tablet in ['tablet', 'ipad']):
-        device_info['is_tablet'] = True
-        device_info['is_desktop'] = False
-    
-    # Browser detection
-    if 'chrome' in user_agent_lower:
-        device_info['browser'] = 'Chrome'
-    elif 'firefox' in user_agent_lower:
-        device_info['browser'] = 'Firefox'
-    elif 'safari' in user_agent_lower:
-        device_info['browser'] = 'Safari'
-    elif 'edge' in user_agent_lower:
-        device_info['browser'] = 'Edge'
-    
-    # OS detection
-    if 'windows' in user_agent_lower:
-        device_info['os'] = 'Windows'
-    elif 'mac' in user_agent_lower:
-        device_info['os'] = 'macOS'
-    elif 'linux' in user_agent_lower:
-        device_info['os'] = 'Linux'
-    elif 'android' in user_agent_lower:
-        device_info['os'] = 'Android'
-    elif 'ios' in user_agent_lower:
-        device_info['os'] = 'iOS'
-    
-    return device_info
+
+
+def get_rate_limit_ident(request):
+    """Client IP for rate limiting; X-Forwarded-For is only trusted for REST_FRAMEWORK['NUM_PROXIES'] hops"""
+    return BaseThrottle().get_ident(request)
+
+
+def rate_limit_key(identifier, action):
+    """Cache key counting action hits for an IP, email or user"""
+    return f"rate_limit:{action}:{identifier}"
+
+
+def is_rate_limited(identifier, action, limit):
+    """Whether identifier already used up its limit; does not count this call"""
+    return cache.get(rate_limit_key(identifier, action), 0) >= limit
+
+
+def record_rate_limit_hit(identifier, action, window_minutes=60):
+    """Count one hit against identifier's fixed window and return the count"""
+    key = rate_limit_key(identifier, action)
+    timeout = window_minutes * 60
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Window expired between add() and incr()
+        cache.set(key, 1, timeout)
+        return 1
 
 
 def rate_limit_check(user_or_ip, action, limit=5, window_minutes=60):
     """Check if action is rate limited"""
-    from django.core.cache import cache
-    
-    if hasattr(user_or_ip, 'email'):
-        key = f"rate_limit:{action}:{user_or_ip.email}"
-    else:
-        key = f"rate_limit:{action}:{user_or_ip}"
-    
-    current_count = cache.get(key, 0)
+    identifier = user_or_ip.email if hasattr(user_or_ip, 'email') else user_or_ip
     
-    if current_count >= limit:
-        return False, limit - current_count
+    # add() is SET NX and incr() is INCR on Redis, so concurrent
+    # requests can't both read the same count and slip past the limit
+    current_count = record_rate_limit_hit(identifier, action, window_minutes)
     
-    # Increment counter
-    cache.set(key, current_count + 1, window_minutes * 60)
+    if current_count > limit:
+        return False, 0
     
-    return True, limit - (current_count + 1)
+    return True, limit - current_count
 
@@ -5,11 +5,13 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import cache
 from django.utils import timezone
-from datetime import timedelta
+from django.db import transaction
 from django.db.models import Count, Q
 
-from .models import User, LoginAttempt, EmailVerificationToken
+from .models import User, LoginAttempt
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -21,7 +23,19 @@ from .serializers import (
     EmailAvailabilitySerializer,
     UsernameAvailabilitySerializer,
 )
-from .utils import get_client_ip, send_verification_email
+from .tasks import (
+    log_login_attempt_task,
+    purge_user_data_task,
+    send_verification_email_task,
+)
+from .utils import (
+    get_client_ip,
+    get_login_attempt_stats,
+    get_rate_limit_ident,
+    is_available,
+    is_rate_limited,
+    record_rate_limit_hit,
+)
 
 User = get_user_model()
 
@@ -50,14 +64,32 @@ class UserLoginView(APIView):
     permission_classes = [permissions.AllowAny]
     
     def post(self, request):
+        # Brute-force protection is counted in cache, not by scanning LoginAttempt.
+        # Only failures count, per client IP and per targeted account; the 2FA
+        # challenge counts too, which also caps how many codes get mailed.
+        ip_address = get_rate_limit_ident(request)
+        email = str(request.data.get('email') or '').lower()
+        if (
+            is_rate_limited(ip_address, 'login', limit=5)
+            or is_rate_limited(email, 'login_email', limit=10)
+        ):
+            return Response(
+                {'message': 'Muitas tentativas de login. Tente novamente em instantes.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+        
         serializer = UserLoginSerializer(data=request.data, context={'request': request})
         
         try:
             serializer.is_valid(raise_exception=True)
         except Exception as e:
+            record_rate_limit_hit(ip_address, 'login', window_minutes=1)
+            if email:
+                record_rate_limit_hit(email, 'login_email', window_minutes=15)
+            
             # Log failed login attempt
             self._log_login_attempt(
-                request.data.get('email', ''),
+                email,
                 request,
                 success=False,
                 failure_reason=str(e)
@@ -73,9 +105,8 @@ class UserLoginView(APIView):
             success=True
         )
         
-        # Update last login IP
-        user.last_login_ip = get_client_ip(request)
-        user.save(update_fields=['last_login_ip'])
+        # Updates last_login and last_login_ip and records the session device
+        user_logged_in.send(sender=user.__class__, request=request, user=user)
         
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
@@ -87,13 +118,13 @@ class UserLoginView(APIView):
         })
     
     def _log_login_attempt(self, email, request, success, failure_reason=''):
-        """Log login attempt for security monitoring"""
-        LoginAttempt.objects.create(
-            email=email,
-            ip_address=get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            success=success,
-            failure_reason=failure_reason
+        """Log login attempt for security monitoring, off the request path"""
+        ip_address = get_client_ip(request)
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        transaction.on_commit(
+            lambda: log_login_attempt_task.delay(
+                email, ip_address, user_agent, success, failure_reason[:100]
+            )
         )
 
 
@@ -164,20 +195,16 @@ class ResendVerificationEmailView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if there's a recent verification email
-        recent_token = EmailVerificationToken.objects.filter(
-            user=user,
-            purpose='email_verification',
-            created_at__gte=timezone.now() - timedelta(minutes=5)
-        ).first()
-        
-        if recent_token:
+        # One email per 5 minutes; add() is a single SET NX EX on Redis
+        if not cache.add(f"email_verify_lock:{user.id}", 1, 300):
             return Response(
                 {'message': 'Email de verificação já enviado recentemente. Aguarde 5 minutos.'},
                 status=status.HTTP_429_TOO_MANY_REQUESTS
             )
         
-        send_verification_email(user, 'email_verification')
+        transaction.on_commit(
+            lambda: send_verification_email_task.delay(str(user.id), 'email_verification')
+        )
         
         return Response({'message': 'Email de verificação enviado.'})
 
@@ -212,23 +239,14 @@ class UserStatsView(APIView):
     
     def get(self, request):
         user = request.user
-        today = timezone.now().date()
         
         # Calculate statistics
-        login_attempts_today = LoginAttempt.objects.filter(
-            email=user.email,
-            timestamp__date=today
-        ).count()
-        
-        total_login_attempts = LoginAttempt.objects.filter(
-            email=user.email
-        ).count()
-        
+        login_stats = get_login_attempt_stats(user)
         account_age = (timezone.now().date() - user.created_at.date()).days
         
         stats = {
-            'login_attempts_today': login_attempts_today,
-            'total_login_attempts': total_login_attempts,
+            'login_attempts_today': login_stats['today'],
+            'total_login_attempts': login_stats['total'],
             'account_age_days': account_age,
             'is_verified': user.is_verified,
             'is_2fa_enabled': user.is_2fa_enabled,
@@ -248,7 +266,7 @@ def check_email_availability(request):
     serializer.is_valid(raise_exception=True)
     
     email = serializer.validated_data['email']
-    available = not User.objects.filter(email__iexact=email).exists()
+    available = is_available('email', email)
     
     return Response({'available': available})
 
@@ -261,7 +279,7 @@ def check_username_availability(request):
     serializer.is_valid(raise_exception=True)
     
     username = serializer.validated_data['username']
-    available = not User.objects.filter(username__iexact=username).exists()
+    available = is_available('username', username)
     
     return Response({'available': available})
 
@@ -341,7 +359,11 @@ class DeleteAccountView(APIView):
         user.is_active = False
         user.email = f"deleted_{user.id}@sombreando.com"
         user.username = f"deleted_{user.id}"
-        user.save()
+        
+        with transaction.atomic():
+            # Saved through the model so the cached user is dropped right away
+            user.save(update_fields=['is_active', 'email', 'username'])
+            transaction.on_commit(lambda: purge_user_data_task.delay(str(user.id)))
         
         return Response({'message': 'Conta deletada com sucesso.'})
 
@@ -352,23 +374,13 @@ class SecurityLogView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
+        # Plain dicts of the returned columns; no model instances are built
         return LoginAttempt.objects.filter(
-            email=self.request.user.email
-        ).order_by('-timestamp')[:50]  # Last 50 attempts
+            user_id=self.request.user.pk
+        ).order_by('-timestamp').values(
+            'timestamp', 'ip_address', 'success', 'failure_reason', 'country', 'city'
+        )[:50]  # Last 50 attempts
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        
-        data = []
-        for attempt in queryset:
-            data.append({
-                'timestamp': attempt.timestamp,
-                'ip_address': attempt.ip_address,
-                'success': attempt.success,
-                'failure_reason': attempt.failure_reason,
-                'country': attempt.country,
-                'city': attempt.city,
-            })
-        
-        return Response(data)
+        return Response(list(self.get_queryset()))
 
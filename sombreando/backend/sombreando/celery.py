@@ -0,0 +1,13 @@
+"""
+Celery configuration for Sombreando project.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sombreando.settings')
+
+app = Celery('sombreando')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -17,6 +17,7 @@ DATABASES = {
         'PASSWORD': 'password',
         'HOST': 'localhost',
         'PORT': '5432',
+        'CONN_MAX_AGE': 600,
     }
 }
 
@@ -41,12 +42,8 @@ INSTALLED_APPS += [
 LOGGING['loggers']['django']['level'] = 'DEBUG'
 LOGGING['loggers']['sombreando']['level'] = 'DEBUG'
 
-# Cache settings for development
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
-}
+# Cache settings come from base: Redis, like production, so rate limits
+# and cached users are shared across runserver/gunicorn worker processes
 
 # Media files in development
 MEDIA_ROOT = BASE_DIR / 'media'
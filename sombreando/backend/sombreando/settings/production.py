@@ -2,6 +2,8 @@
 Production settings for Sombreando
 """
 
+import logging
+
 import dj_database_url
 from .base import *
 
@@ -48,19 +50,41 @@ EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # Cache configuration for production
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': config('REDIS_URL'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
         }
-    }
+    },
+    'sessions': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config('REDIS_SESSIONS_URL', default=config('REDIS_URL')),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        }
+    },
 }
 
+# Celery broker; no localhost fallback, and never the cache's Redis DB
+CELERY_BROKER_URL = config('CELERY_BROKER_URL')
+
 # Logging configuration for production
+# INFO goes out as one JSON line per record for the log aggregator; process and
+# thread ids are only worth formatting for warnings and errors.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'below_warning': {
+            '()': 'django.utils.log.CallbackFilter',
+            'callback': lambda record: record.levelno < logging.WARNING,
+        },
+    },
     'formatters': {
+        'json': {
+            '()': 'pythonjsonlogger.jsonlogger.JsonFormatter',
+            'format': '%(levelname)s %(asctime)s %(name)s %(message)s',
+        },
         'verbose': {
             'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
             'style': '{',
@@ -70,21 +94,27 @@ LOGGING = {
         'console': {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
+            'filters': ['below_warning'],
+            'formatter': 'json',
+        },
+        'console_errors': {
+            'level': 'WARNING',
+            'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
     },
     'root': {
-        'handlers': ['console'],
+        'handlers': ['console', 'console_errors'],
         'level': 'WARNING',
     },
     'loggers': {
         'django': {
-            'handlers': ['console'],
+            'handlers': ['console', 'console_errors'],
             'level': 'INFO',
             'propagate': False,
         },
         'sombreando': {
-            'handlers': ['console'],
+            'handlers': ['console', 'console_errors'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -105,7 +135,7 @@ sentry_sdk.init(
         ),
         RedisIntegration(),
     ],
-    traces_sample_rate=0.1,
+    traces_sample_rate=config('SENTRY_TRACES_SAMPLE_RATE', default=0.05, cast=float),
     send_default_pii=False,
     environment='production',
 )
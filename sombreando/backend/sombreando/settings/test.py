@@ -0,0 +1,46 @@
+"""
+Test settings for Sombreando
+"""
+
+from .base import *
+
+# Rebuild the list; local.py extends the one shared with base in place
+INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
+
+# In-memory SQLite; no disk I/O and the connection lives for the whole run
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {
+            'NAME': ':memory:',
+        },
+    }
+}
+
+# Fast password hashing; never use outside tests
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# Email backend for tests
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Cache settings for tests
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+# Run Celery tasks inline
+CELERY_TASK_ALWAYS_EAGER = True
+
+# Logging for tests (no log file)
+LOGGING['loggers']['django']['handlers'] = ['console']
+LOGGING['loggers']['sombreando']['handlers'] = ['console']
+del LOGGING['handlers']['file']